@@ -19,10 +19,10 @@ from __future__ import print_function
 
 # imports needed on both server and portal side
 import os
+import struct
 import time
 from collections import defaultdict, namedtuple
 from itertools import count
-from cStringIO import StringIO
 try:
     import cPickle as pickle
 except ImportError:
@@ -36,20 +36,20 @@ import zlib  # Used in Compressed class
 
 DUMMYSESSION = namedtuple('DummySession', ['sessid'])(0)
 
-# communication bits
-# (chr(9) and chr(10) are \t and \n, so skipping them)
-
-PCONN = chr(1)         # portal session connect
-PDISCONN = chr(2)      # portal session disconnect
-PSYNC = chr(3)         # portal session sync
-SLOGIN = chr(4)        # server session login
-SDISCONN = chr(5)      # server session disconnect
-SDISCONNALL = chr(6)   # server session disconnect all
-SSHUTD = chr(7)        # server shutdown
-SSYNC = chr(8)         # server session sync
-SCONN = chr(11)        # server creating new connection (for irc bots and etc)
-PCONNSYNC = chr(12)    # portal post-syncing a session
-PDISCONNALL = chr(13)  # portal session disconnect all
+# communication bits (operation codes)
+# (9 and 10 are skipped, as they were \t and \n when these were chars)
+
+PCONN = 1              # portal session connect
+PDISCONN = 2           # portal session disconnect
+PSYNC = 3              # portal session sync
+SLOGIN = 4             # server session login
+SDISCONN = 5           # server session disconnect
+SDISCONNALL = 6        # server session disconnect all
+SSHUTD = 7             # server shutdown
+SSYNC = 8              # server session sync
+SCONN = 11             # server creating new connection (for irc bots and etc)
+PCONNSYNC = 12         # portal post-syncing a session
+PDISCONNALL = 13       # portal session disconnect all
 AMP_MAXLEN = amp.MAX_VALUE_LENGTH    # max allowed data length in AMP protocol (cannot be changed)
 
 BATCH_RATE = 250     # max commands/sec before switching to batch-sending
@@ -136,6 +136,8 @@ class AmpClientFactory(protocol.ReconnectingClientFactory):
         """
         self.portal = portal
         self.protocol = AMPProtocol
+        # set when the server announces it is about to restart
+        self.server_restart_mode = False
 
     def startedConnecting(self, connector):
         """
@@ -171,7 +173,7 @@ class AmpClientFactory(protocol.ReconnectingClientFactory):
             reason (str): Eventual text describing why connection was lost.
 
         """
-        if hasattr(self, "server_restart_mode"):
+        if self.server_restart_mode:
             self.portal.sessions.announce_all(" Server restarting ...")
             self.maxDelay = 2
         else:
@@ -190,7 +192,7 @@ class AmpClientFactory(protocol.ReconnectingClientFactory):
             reason (str): Eventual text describing why connection failed.
 
         """
-        if hasattr(self, "server_restart_mode"):
+        if self.server_restart_mode:
             self.maxDelay = 2
         else:
             self.maxDelay = 10
@@ -214,28 +216,24 @@ class Compressed(amp.String):
         Converts from box representation to python. We
         group very long data into batches.
         """
-        value = StringIO()
-        value.write(strings.get(name))
+        chunks = [strings.get(name)]
         for counter in count(2):
             # count from 2 upwards
             chunk = strings.get("%s.%d" % (name, counter))
             if chunk is None:
                 break
-            value.write(chunk)
-        objects[name] = value.getvalue()
+            chunks.append(chunk)
+        objects[name] = chunks[0] if len(chunks) == 1 else "".join(chunks)
 
     def toBox(self, name, strings, objects, proto):
         """
         Convert from data to box. We handled too-long
         batched data and put it together here.
         """
-        value = StringIO(objects[name])
-        strings[name] = value.read(AMP_MAXLEN)
-        for counter in count(2):
-            chunk = value.read(AMP_MAXLEN)
-            if not chunk:
-                break
-            strings["%s.%d" % (name, counter)] = chunk
+        value = objects[name]
+        strings[name] = value[:AMP_MAXLEN]
+        for counter, start in enumerate(range(AMP_MAXLEN, len(value), AMP_MAXLEN), 2):
+            strings["%s.%d" % (name, counter)] = value[start:start + AMP_MAXLEN]
 
     def toString(self, inObject):
         """
@@ -327,6 +325,83 @@ def loads(data):
     return pickle.loads(to_str(data))
 
 
+# Admin operations carrying no data beyond the operation itself are
+# sent as a fixed-size binary frame (operation, sessid) instead of a
+# pickle. A pickle always starts with the PROTO opcode (0x80), so only
+# operation codes below that are sent this way.
+
+_CONTROL_FRAME = struct.Struct("!BI")
+_PICKLE_PROTO = "\x80"  # pickle PROTO opcode (not exposed by cPickle)
+_MAX_CONTROL_SESSID = 0xFFFFFFFF
+
+
+def pack_control(sessid, operation):
+    """
+    Pack a data-less admin operation into a binary frame.
+
+    Args:
+        sessid (int): Session id.
+        operation (int): Operation code, one of the globals of this module.
+
+    Returns:
+        frame (str): The packed frame.
+
+    """
+    return _CONTROL_FRAME.pack(operation, sessid)
+
+
+def unpack_control(frame):
+    """
+    Unpack a frame created by `pack_control`.
+
+    Args:
+        frame (str): The packed frame.
+
+    Returns:
+        sessid, operation (tuple): The unpacked data.
+
+    """
+    operation, sessid = _CONTROL_FRAME.unpack(frame)
+    return sessid, operation
+
+
+def pack_admin_data(sessid, operation, kwargs):
+    """
+    Pack an admin operation for sending, using a binary frame when
+    there is no data besides the operation code and a pickle otherwise.
+
+    Args:
+        sessid (int): Session id.
+        operation (int): Operation code, one of the globals of this module.
+        kwargs (dict): Extra data for the operation.
+
+    Returns:
+        packed_data (str): Data ready to be sent across the wire.
+
+    """
+    if (not kwargs and type(operation) is int and 0 <= operation < 0x80 and
+            isinstance(sessid, int) and 0 <= sessid <= _MAX_CONTROL_SESSID):
+        return pack_control(sessid, operation)
+    return dumps((sessid, dict(kwargs, operation=operation)))
+
+
+def unpack_data(packed_data):
+    """
+    Unpack data packed with `pack_admin_data` or `dumps`.
+
+    Args:
+        packed_data (str): Data received over the wire.
+
+    Returns:
+        sessid, kwargs (tuple): The session id and data dict.
+
+    """
+    if packed_data[0] != _PICKLE_PROTO:
+        sessid, operation = unpack_control(packed_data)
+        return sessid, {"operation": operation}
+    return loads(packed_data)
+
+
 # -------------------------------------------------------------
 # Core AMP protocol for communication Server <-> Portal
 # -------------------------------------------------------------
@@ -364,7 +439,9 @@ class AMPProtocol(amp.AMP):
 
         """
         # this makes for a factor x10 faster sends across the wire
-        self.transport.setTcpNoDelay(True)
+        # (only TCP transports support it, not e.g. UNIX sockets)
+        if hasattr(self.transport, "setTcpNoDelay"):
+            self.transport.setTcpNoDelay(True)
 
         if hasattr(self.factory, "portal"):
             # only the portal has the 'portal' property, so we know we are
@@ -373,9 +450,9 @@ class AMPProtocol(amp.AMP):
             self.send_AdminPortal2Server(DUMMYSESSION,
                                          PSYNC,
                                          sessiondata=sessdata)
+            self.factory.portal.amp_connected = True
             self.factory.portal.sessions.at_server_connection()
-            if hasattr(self.factory, "server_restart_mode"):
-                del self.factory.server_restart_mode
+            self.factory.server_restart_mode = False
 
     def connectionLost(self, reason):
         """
@@ -386,8 +463,13 @@ class AMPProtocol(amp.AMP):
         that is irrelevant. If a true connection error happens, the
         portal will continuously try to reconnect, showing the problem
         that way.
+
+        On the portal side this also clears `Portal.amp_connected`,
+        making the portal sessionhandler hold back player input until
+        the connection is re-established.
         """
-        pass
+        if hasattr(self.factory, "portal"):
+            self.factory.portal.amp_connected = False
 
     # Error handling
 
@@ -420,9 +502,23 @@ class AMPProtocol(amp.AMP):
             Data will be sent across the wire pickled as a tuple
             (sessid, kwargs).
 
+        """
+        return self.send_packed(command, dumps((sessid, kwargs)))
+
+    def send_packed(self, command, packed_data):
+        """
+        Send already packed data across the wire.
+
+        Args:
+            command (AMP Command): A protocol send command.
+            packed_data (str): Data packed with `dumps` or `pack_admin_data`.
+
+        Returns:
+            deferred (deferred or None): A deferred with an errback.
+
         """
         return self.callRemote(command,
-                               packed_data=dumps((sessid, kwargs))
+                               packed_data=packed_data
                                ).addErrback(self.errback, command.key)
 
     # Message definition + helper methods to call/create each message type
@@ -436,10 +532,11 @@ class AMPProtocol(amp.AMP):
         on the Server.
 
         Args:
-            packed_data (str): Data to receive (a pickled tuple (sessid,kwargs))
+            packed_data (str): Data to receive (a pickled tuple (sessid,kwargs)
+                or a control frame)
 
         """
-        sessid, kwargs = loads(packed_data)
+        sessid, kwargs = unpack_data(packed_data)
         session = self.factory.server.sessions.get(sessid, None)
         if session:
             self.factory.server.sessions.data_in(session, **kwargs)
@@ -468,9 +565,10 @@ class AMPProtocol(amp.AMP):
         This method is executed on the Portal.
 
         Args:
-            packed_data (str): Pickled data (sessid, kwargs) coming over the wire.
+            packed_data (str): Pickled data (sessid, kwargs) or control frame
+                coming over the wire.
         """
-        sessid, kwargs = loads(packed_data)
+        sessid, kwargs = unpack_data(packed_data)
         session = self.factory.portal.sessions.get(sessid, None)
         if session:
             self.factory.portal.sessions.data_out(session, **kwargs)
@@ -489,6 +587,42 @@ class AMPProtocol(amp.AMP):
         return self.send_data(MsgServer2Portal, session.sessid, **kwargs)
 
     # Server administration from the Portal side
+
+    # handlers for the admin operations, called as
+    # handler(self, sessid, kwargs, server_sessionhandler)
+
+    def _server_portal_connect(self, sessid, kwargs, server_sessionhandler):
+        # create a new session and sync it
+        server_sessionhandler.portal_connect(kwargs.get("sessiondata"))
+
+    def _server_portal_session_sync(self, sessid, kwargs, server_sessionhandler):
+        server_sessionhandler.portal_session_sync(kwargs.get("sessiondata"))
+
+    def _server_portal_disconnect(self, sessid, kwargs, server_sessionhandler):
+        # session closed from portal sid
+        session = server_sessionhandler.get(sessid)
+        if session:
+            server_sessionhandler.portal_disconnect(session)
+
+    def _server_portal_disconnect_all(self, sessid, kwargs, server_sessionhandler):
+        # portal orders all sessions to close
+        server_sessionhandler.portal_disconnect_all()
+
+    def _server_portal_sessions_sync(self, sessid, kwargs, server_sessionhandler):
+        # force a resync of sessions when portal reconnects to
+        # server (e.g. after a server reboot) the data kwarg
+        # contains a dict {sessid: {arg1:val1,...}}
+        # representing the attributes to sync for each
+        # session.
+        server_sessionhandler.portal_sessions_sync(kwargs.get("sessiondata"))
+
+    _ADMIN_PORTAL2SERVER = {
+        PCONN: _server_portal_connect,
+        PCONNSYNC: _server_portal_session_sync,
+        PDISCONN: _server_portal_disconnect,
+        PDISCONNALL: _server_portal_disconnect_all,
+        PSYNC: _server_portal_sessions_sync}
+
     @AdminPortal2Server.responder
     def server_receive_adminportal2server(self, packed_data):
         """
@@ -497,39 +631,15 @@ class AMPProtocol(amp.AMP):
         the Server.
 
         Args:
-            packed_data (str): Incoming, pickled data.
+            packed_data (str): Incoming, pickled data or control frame.
 
         """
-        sessid, kwargs = loads(packed_data)
+        sessid, kwargs = unpack_data(packed_data)
         operation = kwargs.pop("operation", "")
-        server_sessionhandler = self.factory.server.sessions
-
-        if operation == PCONN:  # portal_session_connect
-            # create a new session and sync it
-            server_sessionhandler.portal_connect(kwargs.get("sessiondata"))
-
-        elif operation == PCONNSYNC:  # portal_session_sync
-            server_sessionhandler.portal_session_sync(kwargs.get("sessiondata"))
-
-        elif operation == PDISCONN:  # portal_session_disconnect
-            # session closed from portal sid
-            session = server_sessionhandler.get(sessid)
-            if session:
-                server_sessionhandler.portal_disconnect(session)
-
-        elif operation == PDISCONNALL:  # portal_disconnect_all
-            # portal orders all sessions to close
-            server_sessionhandler.portal_disconnect_all()
-
-        elif operation == PSYNC:  # portal_session_sync
-            # force a resync of sessions when portal reconnects to
-            # server (e.g. after a server reboot) the data kwarg
-            # contains a dict {sessid: {arg1:val1,...}}
-            # representing the attributes to sync for each
-            # session.
-            server_sessionhandler.portal_sessions_sync(kwargs.get("sessiondata"))
-        else:
+        handler = self._ADMIN_PORTAL2SERVER.get(operation)
+        if handler is None:
             raise Exception("operation %(op)s not recognized." % {'op': operation})
+        handler(self, sessid, kwargs, self.factory.server.sessions)
         return {}
 
     def send_AdminPortal2Server(self, session, operation="", **kwargs):
@@ -540,15 +650,59 @@ class AMPProtocol(amp.AMP):
 
         Args:
             session (Session): Session.
-            operation (char, optional): Identifier for the server operation, as defined by the
+            operation (int, optional): Identifier for the server operation, as defined by the
                 global variables in `evennia/server/amp.py`.
             data (str or dict, optional): Data used in the administrative operation.
 
         """
-        return self.send_data(AdminPortal2Server, session.sessid, operation=operation, **kwargs)
+        return self.send_packed(AdminPortal2Server,
+                                pack_admin_data(session.sessid, operation, kwargs))
 
     # Portal administration from the Server side
 
+    # handlers for the admin operations, called as
+    # handler(self, sessid, kwargs, portal_sessionhandler)
+
+    def _portal_server_logged_in(self, sessid, kwargs, portal_sessionhandler):
+        # a session has authenticated; sync it.
+        session = portal_sessionhandler.get(sessid)
+        if session:
+            portal_sessionhandler.server_logged_in(session, kwargs.get("sessiondata"))
+
+    def _portal_server_disconnect(self, sessid, kwargs, portal_sessionhandler):
+        # the server is ordering to disconnect the session
+        session = portal_sessionhandler.get(sessid)
+        if session:
+            portal_sessionhandler.server_disconnect(session, reason=kwargs.get("reason"))
+
+    def _portal_server_disconnect_all(self, sessid, kwargs, portal_sessionhandler):
+        # server orders all sessions to disconnect
+        portal_sessionhandler.server_disconnect_all(reason=kwargs.get("reason"))
+
+    def _portal_server_shutdown(self, sessid, kwargs, portal_sessionhandler):
+        # the server orders the portal to shut down
+        self.factory.portal.shutdown(restart=False)
+
+    def _portal_server_session_sync(self, sessid, kwargs, portal_sessionhandler):
+        # server wants to save session data to the portal,
+        # maybe because it's about to shut down.
+        portal_sessionhandler.server_session_sync(kwargs.get("sessiondata"),
+                                                  kwargs.get("clean", True))
+        # set a flag in case we are about to shut down soon
+        self.factory.server_restart_mode = True
+
+    def _portal_server_connect(self, sessid, kwargs, portal_sessionhandler):
+        # server_force_connection (for irc/etc)
+        portal_sessionhandler.server_connect(**kwargs)
+
+    _ADMIN_SERVER2PORTAL = {
+        SLOGIN: _portal_server_logged_in,
+        SDISCONN: _portal_server_disconnect,
+        SDISCONNALL: _portal_server_disconnect_all,
+        SSHUTD: _portal_server_shutdown,
+        SSYNC: _portal_server_session_sync,
+        SCONN: _portal_server_connect}
+
     @AdminServer2Portal.responder
     def portal_receive_adminserver2portal(self, packed_data):
         """
@@ -557,46 +711,16 @@ class AMPProtocol(amp.AMP):
         This is executed on the Portal.
 
         Args:
-            packed_data (str): Data received, a pickled tuple (sessid, kwargs).
+            packed_data (str): Data received, a pickled tuple (sessid, kwargs)
+                or a control frame.
 
         """
-        sessid, kwargs = loads(packed_data)
+        sessid, kwargs = unpack_data(packed_data)
         operation = kwargs.pop("operation")
-        portal_sessionhandler = self.factory.portal.sessions
-
-        if operation == SLOGIN:  # server_session_login
-            # a session has authenticated; sync it.
-            session = portal_sessionhandler.get(sessid)
-            if session:
-                portal_sessionhandler.server_logged_in(session, kwargs.get("sessiondata"))
-
-        elif operation == SDISCONN:  # server_session_disconnect
-            # the server is ordering to disconnect the session
-            session = portal_sessionhandler.get(sessid)
-            if session:
-                portal_sessionhandler.server_disconnect(session, reason=kwargs.get("reason"))
-
-        elif operation == SDISCONNALL:  # server_session_disconnect_all
-            # server orders all sessions to disconnect
-            portal_sessionhandler.server_disconnect_all(reason=kwargs.get("reason"))
-
-        elif operation == SSHUTD:  # server_shutdown
-            # the server orders the portal to shut down
-            self.factory.portal.shutdown(restart=False)
-
-        elif operation == SSYNC:  # server_session_sync
-            # server wants to save session data to the portal,
-            # maybe because it's about to shut down.
-            portal_sessionhandler.server_session_sync(kwargs.get("sessiondata"),
-                                                      kwargs.get("clean", True))
-            # set a flag in case we are about to shut down soon
-            self.factory.server_restart_mode = True
-
-        elif operation == SCONN:  # server_force_connection (for irc/etc)
-            portal_sessionhandler.server_connect(**kwargs)
-
-        else:
+        handler = self._ADMIN_SERVER2PORTAL.get(operation)
+        if handler is None:
             raise Exception("operation %(op)s not recognized." % {'op': operation})
+        handler(self, sessid, kwargs, self.factory.portal.sessions)
         return {}
 
     def send_AdminServer2Portal(self, session, operation="", **kwargs):
@@ -606,13 +730,14 @@ class AMPProtocol(amp.AMP):
 
         Args:
             session (Session): Session.
-            operation (char, optional): Identifier for the server
+            operation (int, optional): Identifier for the server
                 operation, as defined by the global variables in
                 `evennia/server/amp.py`.
             data (str or dict, optional): Data going into the adminstrative.
 
         """
-        return self.send_data(AdminServer2Portal, session.sessid, operation=operation, **kwargs)
+        return self.send_packed(AdminServer2Portal,
+                                pack_admin_data(session.sessid, operation, kwargs))
 
     # Extra functions
 
@@ -51,6 +51,9 @@ HTTP_LOGFILE = None
 PPROFILER_LOGFILE = None
 SPROFILER_LOGFILE = None
 
+# cached subprocess environment, see getenv()
+_ENV_CACHE = None
+
 # messages
 
 CMDLINE_HELP = \
@@ -75,6 +78,9 @@ PROCESS_IOERROR = \
     """
 
 PROCESS_RESTART = "{component} restarting ..."
+# the restart messages are printed on every reload, so build them once
+PROCESS_RESTART_SERVER = PROCESS_RESTART.format(component="Server")
+PROCESS_RESTART_PORTAL = PROCESS_RESTART.format(component="Portal")
 
 PROCESS_DOEXIT = "Deferring to external runner."
 
@@ -91,13 +97,25 @@ def set_restart_mode(restart_file, flag="reload"):
 
 def getenv():
     """
-    Get current environment and add PYTHONPATH
+    Get current environment and add PYTHONPATH. The environment is
+    built once and then reused for every (re)start of the processes.
+    """
+    global _ENV_CACHE
+    if _ENV_CACHE is None:
+        sep = ";" if os.name == "nt" else ":"
+        env = os.environ.copy()
+        sys.path.insert(0, GAMEDIR)
+        env['PYTHONPATH'] = sep.join(sys.path)
+        _ENV_CACHE = env
+    return _ENV_CACHE.copy()
+
+
+def reset_env_cache():
+    """
+    Forget the cached environment so the next `getenv` call rebuilds it.
     """
-    sep = ";" if os.name == "nt" else ":"
-    env = os.environ.copy()
-    sys.path.insert(0, GAMEDIR)
-    env['PYTHONPATH'] = sep.join(sys.path)
-    return env
+    global _ENV_CACHE
+    _ENV_CACHE = None
 
 
 def get_restart_mode(restart_file):
@@ -206,14 +224,14 @@ def start_services(server_argv, portal_argv, doexit=False):
             # restart only if process stopped cleanly
             if (message == "server_stopped" and int(rc) == 0 and
                     get_restart_mode(SERVER_RESTART) in ("True", "reload", "reset")):
-                print(PROCESS_RESTART.format(component="Server"))
+                print(PROCESS_RESTART_SERVER)
                 SERVER = thread.start_new_thread(server_waiter, (processes, ))
                 continue
 
             # normally the portal is not reloaded since it's run as a daemon.
             if (message == "portal_stopped" and int(rc) == 0 and
                     get_restart_mode(PORTAL_RESTART) == "True"):
-                print(PROCESS_RESTART.format(component="Portal"))
+                print(PROCESS_RESTART_PORTAL)
                 PORTAL = thread.start_new_thread(portal_waiter, (processes, ))
                 continue
             break
@@ -75,7 +75,8 @@ WEBSOCKET_CLIENT_ENABLED = settings.WEBSOCKET_CLIENT_ENABLED and WEBSOCKET_CLIEN
 AMP_HOST = settings.AMP_HOST
 AMP_PORT = settings.AMP_PORT
 AMP_INTERFACE = settings.AMP_INTERFACE
-AMP_ENABLED = AMP_HOST and AMP_PORT and AMP_INTERFACE
+AMP_UNIX_SOCKET = settings.AMP_UNIX_SOCKET if os.name != 'nt' else None
+AMP_ENABLED = AMP_UNIX_SOCKET or (AMP_HOST and AMP_PORT and AMP_INTERFACE)
 
 
 # -------------------------------------------------------------
@@ -103,6 +104,7 @@ class Portal(object):
         # create a store of services
         self.services = service.IServiceCollection(application)
         self.amp_protocol = None  # set by amp factory
+        self.amp_connected = False  # set by amp protocol
         self.sessions = PORTAL_SESSIONS
         self.sessions.portal = self
 
@@ -189,10 +191,13 @@ if AMP_ENABLED:
 
     from evennia.server import amp
 
-    print('  amp (to Server): %s' % AMP_PORT)
-
     factory = amp.AmpClientFactory(PORTAL)
-    amp_client = internet.TCPClient(AMP_HOST, AMP_PORT, factory)
+    if AMP_UNIX_SOCKET:
+        print('  amp (to Server): %s' % AMP_UNIX_SOCKET)
+        amp_client = internet.UNIXClient(AMP_UNIX_SOCKET, factory)
+    else:
+        print('  amp (to Server): %s' % AMP_PORT)
+        amp_client = internet.TCPClient(AMP_HOST, AMP_PORT, factory)
     amp_client.setName('evennia_amp')
     PORTAL.services.addService(amp_client)
 
@@ -27,6 +27,11 @@ _MIN_TIME_BETWEEN_COMMANDS = 1.0 / float(_MAX_COMMAND_RATE)
 _ERROR_COMMAND_OVERFLOW = settings.COMMAND_RATE_WARNING
 _ERROR_MAX_CHAR = settings.MAX_CHAR_LIMIT_WARNING
 
+# max number of inputs held per session while the Server is unreachable
+_MAX_PENDING_INPUT = 20
+# Don't translate this; avoid loading django on portal side.
+_ERROR_PENDING_INPUT = "The Server is not reachable right now; input ignored."
+
 _CONNECTION_QUEUE = deque()
 
 DUMMYSESSION = namedtuple('DummySession', ['sessid'])(0)
@@ -61,14 +66,24 @@ class PortalSessionHandler(SessionHandler):
 
         self.connection_last = self.uptime
         self.connection_task = None
+        # input received while the Server is unreachable, {sessid: [kwargs, ...]}
+        self.pending_input = {}
 
     def at_server_connection(self):
         """
         Called when the Portal establishes connection with the Server.
-        At this point, the AMP connection is already established.
+        At this point, the AMP connection is already established and
+        the sessions have been synced, so any input held back while the
+        Server was unreachable is relayed, in order.
 
         """
         self.connection_time = time.time()
+        pending_input, self.pending_input = self.pending_input, {}
+        for sessid, inputs in pending_input.items():
+            session = self.get(sessid)
+            if session:
+                for kwargs in inputs:
+                    self.relay_input(session, kwargs)
 
     def connect(self, session):
         """
@@ -99,7 +114,7 @@ class PortalSessionHandler(SessionHandler):
                                  settings.SERVERNAME,
                                  len(_CONNECTION_QUEUE) * _MIN_TIME_BETWEEN_CONNECTS)], {}])
         now = time.time()
-        if (now - self.connection_last < _MIN_TIME_BETWEEN_CONNECTS) or not self.portal.amp_protocol:
+        if (now - self.connection_last < _MIN_TIME_BETWEEN_CONNECTS) or not self.portal.amp_connected:
             if not session or not self.connection_task:
                 self.connection_task = reactor.callLater(_MIN_TIME_BETWEEN_CONNECTS, self.connect, None)
             self.connection_last = now
@@ -138,7 +153,7 @@ class PortalSessionHandler(SessionHandler):
             # once to the server - if so we must re-sync woth the server, otherwise
             # we skip this step.
             sessdata = session.get_sync_data()
-            if self.portal.amp_protocol:
+            if self.portal.amp_connected:
                 # we only send sessdata that should not have changed
                 # at the server level at this point
                 sessdata = dict((key, val) for key, val in sessdata.items() if key in ("protocol_key",
@@ -166,6 +181,7 @@ class PortalSessionHandler(SessionHandler):
 
         """
         global _CONNECTION_QUEUE
+        self.pending_input.pop(session.sessid, None)
         if session in _CONNECTION_QUEUE:
             # connection was already dropped before we had time
             # to forward this to the Server, so now we just remove it.
@@ -384,19 +400,36 @@ class PortalSessionHandler(SessionHandler):
                 self.data_out(session, text=[[_ERROR_COMMAND_OVERFLOW], {}])
                 return
 
-            if not self.portal.amp_protocol:
+            if not self.portal.amp_connected:
                 # this can happen if someone connects before AMP connection
-                # was established (usually on first start)
-                reactor.callLater(1.0, self.data_in, session, **kwargs)
+                # was established (usually on first start) or while the
+                # Server is reloading or down. Hold on to the input until
+                # the Server is back (see at_server_connection).
+                pending = self.pending_input.setdefault(session.sessid, [])
+                if len(pending) < _MAX_PENDING_INPUT:
+                    pending.append(kwargs)
+                else:
+                    self.data_out(session, text=[[_ERROR_PENDING_INPUT], {}])
                 return
 
-            # scrub data
-            kwargs = self.clean_senddata(session, kwargs)
+            self.relay_input(session, kwargs)
+
+    def relay_input(self, session, kwargs):
+        """
+        Scrub input and send it on to the Server.
+
+        Args:
+            session (Session): Session the input comes from.
+            kwargs (dict): Input data, as given to `data_in`.
+
+        """
+        # scrub data
+        kwargs = self.clean_senddata(session, kwargs)
 
-            # relay data to Server
-            session.cmd_last = now
-            self.portal.amp_protocol.send_MsgPortal2Server(session,
-                                                           **kwargs)
+        # relay data to Server
+        session.cmd_last = time.time()
+        self.portal.amp_protocol.send_MsgPortal2Server(session,
+                                                       **kwargs)
 
     def data_out(self, session, **kwargs):
         """
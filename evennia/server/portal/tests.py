@@ -9,7 +9,10 @@ except ImportError:
     import unittest
 
 import string
-from evennia.server.portal import irc
+import time
+from mock import Mock, call
+from evennia.server import amp
+from evennia.server.portal import irc, portalsessionhandler
 
 
 class TestIRC(TestCase):
@@ -73,3 +76,56 @@ class TestIRC(TestCase):
         s = r'|wthis|Xis|gis|Ma|C|complex|*string'
 
         self.assertEqual(irc.parse_irc_to_ansi(irc.parse_ansi_to_irc(s)), s)
+
+
+class TestAmpConnected(TestCase):
+    """
+    Test that the Portal tracks the AMP connection state and holds back
+    input while the Server is not connected.
+    """
+    def setUp(self):
+        self.portal = Mock(amp_connected=False)
+        self.portal.sessions.get_all_sync_data.return_value = {}
+        self.proto = amp.AMPProtocol()
+        self.proto.factory = Mock(portal=self.portal, server_restart_mode=False)
+        self.proto.transport = Mock()
+        self.proto.send_AdminPortal2Server = Mock()
+
+    def test_connection_made_and_lost(self):
+        self.proto.connectionMade()
+        self.assertTrue(self.portal.amp_connected)
+        self.proto.connectionLost(None)
+        self.assertFalse(self.portal.amp_connected)
+
+    def _make_handler(self):
+        handler = portalsessionhandler.PortalSessionHandler()
+        handler.portal = self.portal
+        session = Mock(sessid=1, command_counter=0, command_counter_reset=time.time())
+        handler[session.sessid] = session
+        handler.clean_senddata = Mock(side_effect=lambda session, kwargs: kwargs)
+        handler.data_out = Mock()
+        return handler, session
+
+    def test_data_in_held_until_server_connection(self):
+        handler, session = self._make_handler()
+        handler.data_in(session, text=[["look"], {}])
+        handler.data_in(session, text=[["inventory"], {}])
+        send = self.portal.amp_protocol.send_MsgPortal2Server
+        send.assert_not_called()
+
+        self.portal.amp_connected = True
+        handler.at_server_connection()
+        self.assertEqual(send.call_args_list,
+                         [call(session, text=[["look"], {}]),
+                          call(session, text=[["inventory"], {}])])
+        self.assertEqual(handler.pending_input, {})
+
+    def test_data_in_pending_input_is_capped(self):
+        handler, session = self._make_handler()
+        for _ in range(portalsessionhandler._MAX_PENDING_INPUT + 1):
+            session.command_counter = 0
+            handler.data_in(session, text=[["look"], {}])
+        self.assertEqual(len(handler.pending_input[session.sessid]),
+                         portalsessionhandler._MAX_PENDING_INPUT)
+        handler.data_out.assert_called_once_with(
+            session, text=[[portalsessionhandler._ERROR_PENDING_INPUT], {}])
@@ -111,7 +111,6 @@ class WebSocketClient(Protocol, Session):
             reason (str): Motivation for the lost connection.
 
         """
-        print("In connectionLost of webclient")
         self.sessionhandler.disconnect(self)
         self.transport.close()
 
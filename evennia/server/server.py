@@ -71,6 +71,7 @@ AMP_ENABLED = True
 AMP_HOST = settings.AMP_HOST
 AMP_PORT = settings.AMP_PORT
 AMP_INTERFACE = settings.AMP_INTERFACE
+AMP_UNIX_SOCKET = settings.AMP_UNIX_SOCKET if os.name != 'nt' else None
 
 WEBSERVER_PORTS = settings.WEBSERVER_PORTS
 WEBSERVER_INTERFACES = settings.WEBSERVER_INTERFACES
@@ -542,15 +543,20 @@ if AMP_ENABLED:
     # the portal and the mud server. Only reason to ever deactivate
     # it would be during testing and debugging.
 
-    ifacestr = ""
-    if AMP_INTERFACE != '127.0.0.1':
-        ifacestr = "-%s" % AMP_INTERFACE
-    print('  amp (to Portal)%s: %s' % (ifacestr, AMP_PORT))
-
     from evennia.server import amp
 
     factory = amp.AmpServerFactory(EVENNIA)
-    amp_service = internet.TCPServer(AMP_PORT, factory, interface=AMP_INTERFACE)
+    if AMP_UNIX_SOCKET:
+        print('  amp (to Portal): %s' % AMP_UNIX_SOCKET)
+        # wantPID lets twisted clean up a stale socket file; the mode
+        # keeps other local users from reaching the (pickle-based) AMP link
+        amp_service = internet.UNIXServer(AMP_UNIX_SOCKET, factory, mode=0o600, wantPID=True)
+    else:
+        ifacestr = ""
+        if AMP_INTERFACE != '127.0.0.1':
+            ifacestr = "-%s" % AMP_INTERFACE
+        print('  amp (to Portal)%s: %s' % (ifacestr, AMP_PORT))
+        amp_service = internet.TCPServer(AMP_PORT, factory, interface=AMP_INTERFACE)
     amp_service.setName("EvenniaPortal")
     EVENNIA.services.addService(amp_service)
 
@@ -47,17 +47,9 @@ class DummySession(object):
 DUMMYSESSION = DummySession()
 
 # AMP signals
-PCONN = chr(1)        # portal session connect
-PDISCONN = chr(2)     # portal session disconnect
-PSYNC = chr(3)        # portal session sync
-SLOGIN = chr(4)       # server session login
-SDISCONN = chr(5)     # server session disconnect
-SDISCONNALL = chr(6)  # server session disconnect all
-SSHUTD = chr(7)       # server shutdown
-SSYNC = chr(8)        # server session sync
-SCONN = chr(11)        # server portal connection (for bots)
-PCONNSYNC = chr(12)   # portal post-syncing session
-PDISCONNALL = chr(13)  # portal session discnnect all
+from evennia.server.amp import (PCONN, PDISCONN, PSYNC, SLOGIN, SDISCONN,
+                                SDISCONNALL, SSHUTD, SSYNC, SCONN,
+                                PCONNSYNC, PDISCONNALL)
 
 # i18n
 from django.utils.translation import ugettext as _
@@ -24,9 +24,13 @@ try:
 except ImportError:
     import unittest
 
+import sys
+
 from django.test.runner import DiscoverRunner
+from mock import Mock, patch
 
 from .deprecations import check_errors
+from . import amp, evennia_runner
 
 
 class EvenniaTestSuiteRunner(DiscoverRunner):
@@ -77,3 +81,103 @@ class TestDeprecations(TestCase):
             self.assertRaises(DeprecationWarning, check_errors, MockSettings(setting))
         # test check for WEBSERVER_PORTS having correct value
         self.assertRaises(DeprecationWarning, check_errors, MockSettings("WEBSERVER_PORTS", value=["not a tuple"]))
+
+
+class TestAmpPacking(TestCase):
+    """
+    Class for testing the AMP data packing helpers.
+    """
+    def test_control_frame(self):
+        packed = amp.pack_admin_data(3, amp.PDISCONN, {})
+        self.assertEqual(len(packed), amp._CONTROL_FRAME.size)
+        self.assertEqual(amp.unpack_data(packed), (3, {"operation": amp.PDISCONN}))
+
+    def test_pickled_data(self):
+        packed = amp.pack_admin_data(3, amp.SDISCONN, {"reason": "Goodbye"})
+        self.assertEqual(amp.unpack_data(packed),
+                         (3, {"operation": amp.SDISCONN, "reason": "Goodbye"}))
+
+    def test_out_of_range_is_pickled(self):
+        for sessid, operation in ((3, 0x80), (3, 300), (3, True), (2 ** 32, amp.PDISCONN)):
+            packed = amp.pack_admin_data(sessid, operation, {})
+            self.assertEqual(packed[0], amp._PICKLE_PROTO)
+            sessid2, kwargs = amp.unpack_data(packed)
+            self.assertEqual(sessid2, sessid)
+            self.assertEqual(kwargs["operation"], operation)
+            self.assertIs(type(kwargs["operation"]), type(operation))
+
+
+class TestAmpAdminDispatch(TestCase):
+    """
+    Class for testing the dispatch of AMP admin operations.
+    """
+    def setUp(self):
+        self.proto = amp.AMPProtocol()
+        self.proto.factory = Mock()
+
+    def test_portal2server_dispatch(self):
+        handler = Mock()
+        packed = amp.dumps((3, {"operation": amp.PCONN, "sessiondata": {"a": 1}}))
+        with patch.dict(amp.AMPProtocol._ADMIN_PORTAL2SERVER, {amp.PCONN: handler}):
+            self.assertEqual(self.proto.server_receive_adminportal2server(packed), {})
+        handler.assert_called_once_with(self.proto, 3, {"sessiondata": {"a": 1}},
+                                        self.proto.factory.server.sessions)
+
+    def test_server2portal_dispatch(self):
+        handler = Mock()
+        packed = amp.pack_admin_data(3, amp.SDISCONN, {})
+        with patch.dict(amp.AMPProtocol._ADMIN_SERVER2PORTAL, {amp.SDISCONN: handler}):
+            self.assertEqual(self.proto.portal_receive_adminserver2portal(packed), {})
+        handler.assert_called_once_with(self.proto, 3, {},
+                                        self.proto.factory.portal.sessions)
+
+    def test_unknown_operation(self):
+        packed = amp.dumps((3, {"operation": 99}))
+        self.assertRaises(Exception, self.proto.server_receive_adminportal2server, packed)
+        self.assertRaises(Exception, self.proto.portal_receive_adminserver2portal, packed)
+
+
+class TestAmpCompressed(TestCase):
+    """
+    Class for testing the chunking of long AMP arguments.
+    """
+    def test_roundtrip(self):
+        maxlen = amp.AMP_MAXLEN
+        argument = amp.Compressed()
+        for length in (0, maxlen, maxlen + 1, 3 * maxlen + 7):
+            value = "".join(chr(i % 256) for i in range(length))
+            strings = {}
+            argument.toBox("data", strings, {"data": value}, None)
+            self.assertTrue(all(len(chunk) <= maxlen for chunk in strings.values()))
+            objects = {}
+            argument.fromBox("data", strings, objects, None)
+            self.assertEqual(objects["data"], value)
+
+
+class TestRunnerGetenv(TestCase):
+    """
+    Class for testing the cached environment of the runner.
+    """
+    def setUp(self):
+        self.syspath = list(sys.path)
+        evennia_runner.reset_env_cache()
+
+    def tearDown(self):
+        evennia_runner.reset_env_cache()
+        sys.path[:] = self.syspath
+
+    @patch.object(evennia_runner, "GAMEDIR", "/tmp/gamedir")
+    def test_getenv_is_cached(self):
+        env = evennia_runner.getenv()
+        npath = len(sys.path)
+        env["EVENNIA_TEST"] = "1"
+        env2 = evennia_runner.getenv()
+        self.assertEqual(len(sys.path), npath)
+        self.assertEqual(env2["PYTHONPATH"], env["PYTHONPATH"])
+        self.assertNotIn("EVENNIA_TEST", env2)
+
+    @patch.object(evennia_runner, "GAMEDIR", "/tmp/gamedir")
+    def test_reset_env_cache(self):
+        evennia_runner.getenv()
+        evennia_runner.reset_env_cache()
+        self.assertIsNone(evennia_runner._ENV_CACHE)
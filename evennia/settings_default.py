@@ -104,6 +104,13 @@ EVENNIA_ADMIN = True
 AMP_HOST = 'localhost'
 AMP_PORT = 4006
 AMP_INTERFACE = '127.0.0.1'
+# Path to a UNIX domain socket to use for the AMP connection instead of
+# TCP. Server and Portal always run on the same machine, so this avoids
+# the overhead of going through the TCP stack. Ignored on Windows, which
+# always uses AMP_HOST/AMP_PORT. The directory holding the socket must
+# already exist; the socket is only accessible to the user running
+# Evennia. Set to None to use TCP.
+AMP_UNIX_SOCKET = None
 
 
 # Path to the lib directory containing the bulk of the codebase's code.
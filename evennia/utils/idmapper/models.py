@@ -560,7 +560,7 @@ def conditional_flush(max_rmem, force=False):
     # check actual memory usage
     Ncache_max = mem2cachesize(max_rmem)
     Ncache, _ = cache_size()
-    actual_rmem = float(os.popen('ps -p %d -o %s | tail -1' % (os.getpid(), "rss")).read()) / 1000.0  # resident memory
+    actual_rmem = float(os.popen('ps -p %d -o %s | tail -1' % (_SELF_PID, "rss")).read()) / 1000.0  # resident memory
 
     if Ncache >= Ncache_max and actual_rmem > max_rmem * 0.9:
         # flush cache when number of objects in cache is big enough and our